@@ -1,189 +1,226 @@
-from flask import Flask
-from polygon import RESTClient
-from dotenv import load_dotenv
 import os
-from auth import api
-from flasgger import APISpec, Schema, Swagger, fields
-from auth import index, login, logout, authorize, signup
-from apispec.ext.marshmallow import MarshmallowPlugin
-from apispec_webframeworks.flask import FlaskPlugin
-import oauth
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
+from typing import List
+
+import uvicorn
+from dotenv import load_dotenv
+from fastapi import Depends, FastAPI, HTTPException, Request
+from pydantic import BaseModel, Field, field_validator
+from starlette.middleware.sessions import SessionMiddleware
+
+from auth import api
+from polygon_client import PolygonClient
 
 load_dotenv()  # Load environment variables from .env file
 
 SESSION_SECRET = os.getenv("SESSION_SECRET", "dev-change-me")  # set a strong random value
+MAX_TICKERS_PER_REQUEST = 50  # bounds the upstream fan-out of composite endpoints
+
 
-app = Flask(__name__)
-app.register_blueprint(api)
-app.config.update(
-    SECRET_KEY=SESSION_SECRET,
-    SESSION_COOKIE_SAMESITE="Lax",      # good default for OAuth code flow
-    SESSION_COOKIE_SECURE=False,        # True in HTTPS/prod
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client per worker process, created inside that worker's event loop
+    app.state.polygon = PolygonClient(os.getenv("POLYGON_API"))
+    try:
+        yield
+    finally:
+        await app.state.polygon.aclose()
+
+
+app = FastAPI(title="Stock Trading API", version="1.0.10", docs_url="/apidocs", lifespan=lifespan)
+app.include_router(api)
+app.add_middleware(
+    SessionMiddleware,
+    secret_key=SESSION_SECRET,
+    same_site="lax",        # good default for OAuth code flow
+    https_only=False,       # True in HTTPS/prod
 )
 
-oauth.init_app(app)
 
-spec = APISpec(
-    title='Flasger Petstore',
-    version='1.0.10',
-    openapi_version='2.0',
-    plugins=[
-        FlaskPlugin(),
-        MarshmallowPlugin(),
-    ],
-)
+def get_client(request: Request) -> PolygonClient:
+    return request.app.state.polygon
+
+
+def normalize_ticker(ticker: str) -> str:
+    # Polygon tickers are case-sensitive and upper-case
+    return ticker.strip().upper()
+
+
+class Position(BaseModel):
+    ticker: str
+    quantity: float
 
+    @field_validator("ticker")
+    @classmethod
+    def _normalize_ticker(cls, ticker: str) -> str:
+        return normalize_ticker(ticker)
+
+
+class PortfolioRequest(BaseModel):
+    positions: List[Position] = Field(..., max_length=MAX_TICKERS_PER_REQUEST)
 
-client = RESTClient(os.getenv("POLYGON_API"))
 
 @app.get("/")
-def home():
+async def home():
     return "Welcome to the Stock Trading API! Visit /apidocs for API documentation."
 
 @app.get("/v1/validate/{symbol}")
-def validate_symbol(symbol: str):
+async def validate_symbol(symbol: str, client: PolygonClient = Depends(get_client)):
     try:
-        symbol_data = client.list_tickers(search=symbol, limit="1")
+        symbol_data = await client.list_tickers(search=symbol, limit=1)
         return {"valid": True, "data": symbol_data}
     except Exception:
         return {"valid": False}
 
 
 @app.get("/v1/symbols/{market}")
-def symbols(market: str = "stocks"):
+async def symbols(market: str = "stocks", client: PolygonClient = Depends(get_client)):
     try:
-        symbols_data = client.list_tickers(market=market)
+        symbols_data = await client.list_tickers(market=market)
         return {"valid": True, "data": symbols_data}
     except Exception:
         return {"valid": False}
 
 
 @app.get("/v1/status")
-def status():
+async def status(client: PolygonClient = Depends(get_client)):
     try:
-        status_data = client.list_tickers(ticker="AAPL")
+        status_data = await client.list_tickers(ticker="AAPL")
         return {"valid": True, "data": status_data}
     except Exception:
         return {"valid": False}
 
 @app.get("/v1/news/{ticker}")
-def news(ticker: str, limit: int = 10):
+async def news(ticker: str, limit: int = 10, client: PolygonClient = Depends(get_client)):
     try:
-        news_generator = client.list_ticker_news(ticker=ticker, limit=str(limit), order="asc", sort="published_utc")
-        news_data = []
-        for news_item in news_generator:
-            if limit <= 0:
-                break
-            news_data.append(news_item)
-            limit -= 1
-        return {"valid": True, "data": news_data}
+        news_data = await client.list_ticker_news(ticker=ticker, limit=limit, order="asc", sort="published_utc")
+        return {"valid": True, "data": news_data[:max(limit, 0)]}
     except Exception:
         return {"valid": False}
 
 
 @app.get("/v1/price/{ticker}")
-def price(ticker: str):
-    try:        
+async def price(ticker: str, client: PolygonClient = Depends(get_client)):
+    try:
         # Try to get recent data, extending the search window if needed
         for days_back in [1, 7, 30]:  # Try 1 day, then 7 days, then 30 days
             end_date = datetime.now().strftime("%Y-%m-%d")
             start_date = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
-            
+
             try:
                 # Use daily aggregates to get the most recent closing prices
-                price_data = client.get_aggs(ticker, 1, "day", start_date, end_date)
-                
+                price_data = await client.get_aggs(ticker, 1, "day", start_date, end_date)
+
                 # If we got data, return the most recent available
-                if hasattr(price_data, 'results') and price_data.results:
-                    return {"valid": True, "data": price_data}
-                elif price_data and len(price_data) > 0:
+                if price_data:
                     return {"valid": True, "data": price_data}
-            except:
+            except Exception:
                 continue  # Try the next time window
-        
+
         # If no aggregate data found, fallback to last trade as ultimate backup
         try:
-            price_data = client.get_last_trade(ticker)
+            price_data = await client.get_last_trade(ticker)
             return {"valid": True, "data": price_data}
-        except:
+        except Exception:
             return {"valid": False, "error": "No recent price data available"}
-            
+
     except Exception as e:
         return {"valid": False, "error": str(e)}
 
+@app.get("/v1/quotes")
+async def quotes(tickers: str, client: PolygonClient = Depends(get_client)):
+    """Last NBBO quote for a comma-separated list of tickers, fetched concurrently."""
+    symbols_list = list(dict.fromkeys(normalize_ticker(t) for t in tickers.split(",") if t.strip()))
+    if len(symbols_list) > MAX_TICKERS_PER_REQUEST:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_TICKERS_PER_REQUEST} tickers per request.")
+    results = await client.fan_out(client.get_last_quote, symbols_list)
+    data = {}
+    for ticker, result in zip(symbols_list, results):
+        if isinstance(result, Exception):
+            data[ticker] = {"valid": False, "error": str(result)}
+        else:
+            data[ticker] = {"valid": True, "data": result}
+    return {"valid": True, "data": data}
+
 @app.post("/v1/candles")
-def candles(ticker: str, timeframe: str = "1Day", start: str = "2023-01-01", end: str = "2023-12-31"):
+async def candles(ticker: str, timeframe: str = "1Day", start: str = "2023-01-01", end: str = "2023-12-31", client: PolygonClient = Depends(get_client)):
     try:
-        candles_data = client.list_aggs(ticker, 1, timeframe, start, end)
+        candles_data = await client.get_aggs(ticker, 1, timeframe, start, end)
         return {"valid": True, "data": candles_data}
     except Exception:
         return {"valid": False}
 
 @app.post("/v1/orderbook")
-def orderbook(ticker: str):
+async def orderbook(ticker: str, client: PolygonClient = Depends(get_client)):
     try:
-        orderbook_data = client.get_last_quote(ticker)
+        orderbook_data = await client.get_last_quote(ticker)
         return {"valid": True, "data": orderbook_data}
     except Exception:
         return {"valid": False}
 
 @app.post("/v1/trades")
-def trades(ticker: str, limit: int = 10):
+async def trades(ticker: str, limit: int = 10, client: PolygonClient = Depends(get_client)):
     return {"valid": True, "data": f"Trades for {ticker} with limit {limit} not implemented yet."} # TODO: Hard code limit because no access
     try:
-        trades_data = client.list_trades(ticker, limit=limit, sort="desc")
+        trades_data = await client.list_trades(ticker, limit=limit, order="desc")
         return {"valid": True, "data": trades_data}
     except Exception:
         return {"valid": False}
 
 @app.post("/v1/portfolio")
-def portfolio():
-    return {"valid": True, "data": "Portfolio endpoint not implemented yet."}
+async def portfolio(body: PortfolioRequest, client: PolygonClient = Depends(get_client)):
+    """Value each position at its previous close, fetching all prices concurrently."""
+    closes = await client.fan_out(client.get_previous_close, [p.ticker for p in body.positions])
+    positions = []
+    total_value = 0.0
+    for position, close in zip(body.positions, closes):
+        if isinstance(close, Exception) or not close:
+            error = str(close) if isinstance(close, Exception) else "No price data available"
+            positions.append({"ticker": position.ticker, "quantity": position.quantity, "valid": False, "error": error})
+            continue
+        value = close["c"] * position.quantity
+        total_value += value
+        positions.append({"ticker": position.ticker, "quantity": position.quantity, "valid": True, "price": close["c"], "value": value})
+    return {"valid": True, "data": {"positions": positions, "total_value": total_value}}
 
 @app.post("/v1/portfolio/positions")
-def portfolio_positions():
+async def portfolio_positions():
     return {"valid": True, "data": "Portfolio positions endpoint not implemented yet."}
 
 @app.post("/v1/orders")
-def orders():
+async def orders():
     return {"valid": True, "data": "Orders endpoint not implemented yet."}
 
 @app.post("/v1/orders/{order_id}")
-def order_details(order_id: str):
+async def order_details(order_id: str):
     return {"valid": True, "data": f"Order details for {order_id} not implemented yet."}
 
 @app.post("/v1/exec/sim")
-def exec_sim():
+async def exec_sim():
     return {"valid": True, "data": "Execution simulation endpoint not implemented yet."}
 
 @app.post("/v1/backtest")
-def backtest():
+async def backtest():
     return {"valid": True, "data": "Backtest endpoint not implemented yet."}
 
 @app.post("/v1/risk/beta")
-def risk_beta():
+async def risk_beta():
     return {"valid": True, "data": "Risk beta endpoint not implemented yet."}
 
 @app.post("/v1/ai/summary")
-def ai_summary(ticker: str):
+async def ai_summary(ticker: str):
     return {"valid": True, "data": f"AI summary for {ticker} not implemented yet."}
 
 @app.post("/v1/alerts")
-def alerts():
+async def alerts():
     return {"valid": True, "data": "Alerts endpoint not implemented yet."}
 
 @app.get("/v1/alerts")
-def get_alerts():
+async def get_alerts():
     return {"valid": True, "data": "Get alerts endpoint not implemented yet."}
 
-template = spec.to_flasgger(
-    app,
-    paths=[validate_symbol, symbols, status, news, price, candles, orderbook, trades, portfolio, portfolio_positions, orders, order_details, exec_sim, backtest, risk_beta, ai_summary, alerts, get_alerts, index, login, logout, authorize, signup],
-)
-
-swag = Swagger(app, template=template)
-
 
 if __name__ == '__main__':
-    app.run(host="0.0.0.0", port=8000, debug=True)
\ No newline at end of file
+    # Workers are separate processes, so uvicorn needs the import string rather than the app object
+    uvicorn.run("app:app", host="0.0.0.0", port=8000, workers=int(os.getenv("WEB_CONCURRENCY", "4")))
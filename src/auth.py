@@ -1,7 +1,7 @@
-from http.client import HTTPException
 import os
 from urllib.parse import urlencode, quote
-from flask import Blueprint, session, url_for, redirect
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse, RedirectResponse
 from authlib.integrations.starlette_client import OAuthError
 from oauth import oauth
 
@@ -14,40 +14,43 @@ SERVER_METADATA_URL = f"{ISSUER}/.well-known/openid-configuration"
 SCOPES = "openid email phone"
 DOMAIN_PREFIX = "us-east-2y3j8ibnue"
 
-api = Blueprint("/user", __name__, url_prefix="/user")
+api = APIRouter(prefix="/user")
 
 def hosted_ui_base() -> str:
     return f"https://{DOMAIN_PREFIX}.auth.{REGION}.amazoncognito.com"
 
-@api.route('/')
-def index():
-    user = session.get('user')
+@api.get('/', response_class=HTMLResponse)
+async def index(request: Request):
+    user = request.session.get('user')
     if user:
         return  f'Hello, {user["email"]}. <a href="/logout">Logout</a>'
     else:
         return f'Welcome! Please <a href="/login">Login</a>.'
 
-@api.route('/authorize')
-def authorize():
-    token = oauth.oidc.authorize_access_token()
+@api.get('/authorize')
+async def authorize(request: Request):
+    try:
+        token = await oauth.oidc.authorize_access_token(request)
+    except OAuthError as e:
+        return HTMLResponse(f"Authorization failed: {e.error}", status_code=400)
     user = token['userinfo']
-    session['user'] = user
-    return redirect("/")
+    request.session['user'] = dict(user)
+    return RedirectResponse("/")
 
-@api.route("/login")
-def login():
+@api.get("/login")
+async def login(request: Request):
     # Must be in your Cognito App client callback list
-    redirect_uri = url_for("/user.authorize", _external=True)
-    return oauth.oidc.authorize_redirect(redirect_uri)
+    redirect_uri = str(request.url_for("authorize"))
+    return await oauth.oidc.authorize_redirect(request, redirect_uri)
 
-@api.route('/logout')
-def logout():
-    session.pop('user', None)
-    return redirect('/')
+@api.get('/logout')
+async def logout(request: Request):
+    request.session.pop('user', None)
+    return RedirectResponse('/')
 
-@api.route("/signup")
-def signup():
-    redirect_uri = url_for("/user.login", _external=True)
+@api.get("/signup")
+async def signup(request: Request):
+    redirect_uri = str(request.url_for("login"))
     q = urlencode(
         {
             "client_id": CLIENT_ID,
@@ -57,16 +60,16 @@ def signup():
         },
         quote_via=quote,
     )
-    return redirect(f"{hosted_ui_base()}/signup?{q}")
+    return RedirectResponse(f"{hosted_ui_base()}/signup?{q}")
 
 @api.get("/me")
-def get_current_user():
+async def get_current_user():
     return {"valid": True, "data": "Get current user not implemented yet."} # TODO: Implement get current user logic with DynamoDB
 
 @api.post("/update")
-def update_user():
+async def update_user():
     return {"valid": True, "data": "User update not implemented yet."} # TODO: Implement user update logic with DynamoDB
 
 @api.post("/get_data")
-def get_user_data():
+async def get_user_data():
     return {"valid": True, "data": "Get user data not implemented yet."} # TODO: Implement get user data logic with DynamoDB
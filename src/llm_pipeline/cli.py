@@ -4,16 +4,26 @@ import click
 from dotenv import load_dotenv
 from .registry.template_registry import TemplateRegistry
 from .pipeline import Pipeline
+from .agents.default_agent import DefaultAgent
 from .config.models import PipelineConfig
+from .daemon import run_daemon
 from pydantic import ValidationError
 
 @click.command()
-@click.option('--input', 'input_json', type=click.File('r'), default='-')
+@click.option('--input', 'input_json', type=click.File('rb'), default=None, help='Input JSON (default: stdin). In daemon mode, newline-delimited requests.')
 @click.option('--config', 'config_json', type=click.File('r'), required=True)
 @click.option('--templates', 'templates_dir', type=click.Path(exists=True), default='templates')
-def main(input_json, config_json, templates_dir):
+@click.option('--daemon', 'daemon', is_flag=True, help='Serve newline-delimited requests until EOF or shutdown.')
+@click.option('--socket', 'socket_path', type=click.Path(), default=None, help='Unix socket to listen on in daemon mode (default: stdin/stdout).')
+@click.option('--concurrency', type=click.IntRange(min=1), default=8, show_default=True, help='Maximum in-flight requests in daemon mode.')
+def main(input_json, config_json, templates_dir, daemon, socket_path, concurrency):
     load_dotenv()
-    input_data = json.load(input_json)
+    if socket_path and not daemon:
+        raise click.ClickException("--socket requires --daemon.")
+    if socket_path and input_json is not None:
+        raise click.ClickException("--input cannot be combined with --socket.")
+    if input_json is None:
+        input_json = sys.stdin.buffer
     config_data = json.load(config_json)
     # Pre-check for required output_schema with friendly error
     if 'output_schema' not in config_data:
@@ -25,8 +35,18 @@ def main(input_json, config_json, templates_dir):
     except ValidationError as ve:
         raise click.ClickException(f"Invalid configuration: {ve}")
     registry = TemplateRegistry(templates_dir)
-    pipeline = Pipeline(registry)
-    result = pipeline.run(input_data=input_data, config=cfg)
+    pipeline = Pipeline(registry, DefaultAgent())
+    if daemon:
+        try:
+            run_daemon(pipeline, cfg, input_stream=input_json, socket_path=socket_path, concurrency=concurrency)
+        except FileExistsError as e:
+            raise click.ClickException(str(e))
+        return
+    input_data = json.load(input_json)
+    try:
+        result = pipeline.run(input_data=input_data, config=cfg)
+    finally:
+        pipeline.close()
     json.dump(result, sys.stdout, indent=2)
     sys.stdout.write("\n")
 
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, Optional
+from .config.models import PipelineConfig
+from .pipeline import Pipeline
+
+# Requests may carry base64 images, so allow lines well past asyncio's 64 KiB default
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+
+def _read_file_line(stream: BinaryIO) -> bytes:
+    """Blocking readline with the same size limit and ValueError as StreamReader.readline."""
+    line = stream.readline(MAX_LINE_BYTES + 1)
+    if len(line) > MAX_LINE_BYTES and not line.endswith(b"\n"):
+        # Discard the rest of the oversized line so reading resumes at the next one
+        while line and not line.endswith(b"\n"):
+            line = stream.readline(MAX_LINE_BYTES)
+        raise ValueError("Line exceeds the size limit.")
+    return line
+
+
+async def _read_stream_line(reader: asyncio.StreamReader) -> bytes:
+    """Read one line from ``reader``, discarding the whole line if it exceeds the reader's limit.
+
+    ``StreamReader.readline`` only drops what is buffered when the limit is hit,
+    so the tail of a line that is still arriving would be read as new requests.
+    Raises ValueError once the oversized line has been skipped up to its newline.
+    """
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError as e:
+        consumed = e.consumed
+    while True:
+        await reader.readexactly(consumed)
+        try:
+            await reader.readuntil(b"\n")
+            break
+        except asyncio.IncompleteReadError:
+            break
+        except asyncio.LimitOverrunError as e:
+            consumed = e.consumed
+    raise ValueError("Line exceeds the size limit.")
+
+
+def _is_pipe_like(stream: BinaryIO) -> bool:
+    """Return True if the event loop can read ``stream`` through a pipe transport."""
+    mode = os.fstat(stream.fileno()).st_mode
+    return stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode) or stat.S_ISCHR(mode)
+
+
+def _claim_socket_path(path: str) -> None:
+    """Remove a stale socket at ``path``; refuse to touch anything else."""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket.")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise FileExistsError(f"Another process is already listening on {path}.")
+
+
+class PipelineDaemon:
+    """Serve newline-delimited pipeline requests from a stream or a Unix socket.
+
+    Each request line is a JSON object ``{"id": ..., "input": {...}}`` and each
+    response line is ``{"id": ..., "result": {...}}`` or ``{"id": ..., "error": "..."}``.
+    Responses are written as requests complete, so they may arrive out of order.
+
+    The pipeline (templates, validators and executor HTTP clients) is shared by
+    all requests. At most ``concurrency`` requests run at once; once that limit
+    is reached the daemon stops reading input until a slot frees up.
+    """
+
+    def __init__(self, pipeline: Pipeline, config: PipelineConfig, concurrency: int = 8):
+        self.pipeline = pipeline
+        self.config = config
+        self.concurrency = concurrency
+        self._slots = asyncio.Semaphore(concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='llm-pipeline')
+
+    async def handle_line(self, line: bytes) -> Optional[Dict[str, Any]]:
+        """Run a single request line through the pipeline and build its response."""
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            # Covers both malformed JSON and bytes that are not valid UTF-8
+            return {'id': None, 'error': f"Invalid JSON: {e}"}
+        if not isinstance(request, dict):
+            return {'id': None, 'error': "Request must be a JSON object with an 'input' object."}
+
+        request_id = request.get('id')
+        if not isinstance(request.get('input'), dict):
+            return {'id': request_id, 'error': "Request must be a JSON object with an 'input' object."}
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                self._pool, lambda: self.pipeline.run(input_data=request['input'], config=self.config)
+            )
+        except Exception as e:
+            return {'id': request_id, 'error': f"{type(e).__name__}: {e}"}
+        return {'id': request_id, 'result': result}
+
+    async def _consume(
+        self,
+        readline: Callable[[], Awaitable[bytes]],
+        write: Callable[[Dict[str, Any]], Awaitable[None]],
+        stop: Optional[asyncio.Event] = None,
+    ) -> None:
+        """Dispatch lines from ``readline`` until EOF or ``stop``, then wait for in-flight requests."""
+        tasks = set()
+
+        async def process(line: bytes) -> None:
+            try:
+                try:
+                    response = await self.handle_line(line)
+                except Exception as e:
+                    response = {'id': None, 'error': f"{type(e).__name__}: {e}"}
+                if response is None:
+                    return
+                try:
+                    await write(response)
+                except (TypeError, ValueError) as e:
+                    # The result could not be serialized; still answer the request
+                    await write({'id': response.get('id'), 'error': f"Unserializable response: {e}"})
+            finally:
+                self._slots.release()
+
+        async def next_line() -> Optional[bytes]:
+            if stop is None:
+                return await readline()
+            read = asyncio.ensure_future(readline())
+            stopped = asyncio.ensure_future(stop.wait())
+            await asyncio.wait({read, stopped}, return_when=asyncio.FIRST_COMPLETED)
+            stopped.cancel()
+            if read.done():
+                return read.result()
+            read.cancel()
+            return None
+
+        try:
+            while stop is None or not stop.is_set():
+                try:
+                    line = await next_line()
+                except ValueError:
+                    # The oversized line has been skipped up to its newline; carry on with the next one
+                    await write({'id': None, 'error': f"Request line exceeds {MAX_LINE_BYTES} bytes."})
+                    continue
+                if not line:
+                    break
+                # Wait for a free slot before reading on, so a saturated daemon applies
+                # backpressure upstream while idle connections hold no slot
+                await self._slots.acquire()
+                task = asyncio.create_task(process(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def serve_stream(self, stream: BinaryIO) -> None:
+        """Serve requests from ``stream`` until EOF, writing responses to stdout."""
+        loop = asyncio.get_running_loop()
+        if _is_pipe_like(stream):
+            reader = asyncio.StreamReader(limit=MAX_LINE_BYTES)
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), stream)
+
+            def readline() -> Awaitable[bytes]:
+                return _read_stream_line(reader)
+        else:
+            # Regular files cannot use a pipe transport, so read them on a thread
+            def readline() -> Awaitable[bytes]:
+                return loop.run_in_executor(None, _read_file_line, stream)
+
+        async def write(response: Dict[str, Any]) -> None:
+            # Writes happen on the event loop thread, so lines never interleave
+            sys.stdout.write(json.dumps(response) + "\n")
+            sys.stdout.flush()
+
+        await self._consume(readline, write)
+
+    async def serve_unix(self, path: str, stop: Optional[asyncio.Event] = None) -> None:
+        """Listen on a Unix socket until ``stop`` is set (by default on SIGINT/SIGTERM).
+
+        On shutdown the daemon stops accepting connections and reading requests,
+        finishes the requests already in flight and then closes every connection.
+        """
+        connections = set()
+        if stop is None:
+            stop = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, stop.set)
+
+        async def on_connect(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            task = asyncio.current_task()
+            connections.add(task)
+            lock = asyncio.Lock()
+
+            async def write(response: Dict[str, Any]) -> None:
+                async with lock:
+                    writer.write((json.dumps(response) + "\n").encode())
+                    await writer.drain()
+
+            try:
+                await self._consume(lambda: _read_stream_line(reader), write, stop)
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+            finally:
+                connections.discard(task)
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except (ConnectionError, asyncio.CancelledError):
+                    pass
+
+        _claim_socket_path(path)
+        server = await asyncio.start_unix_server(on_connect, path=path, limit=MAX_LINE_BYTES)
+        inode = os.lstat(path).st_ino
+        try:
+            await stop.wait()
+            server.close()
+            if connections:
+                await asyncio.gather(*connections, return_exceptions=True)
+            await server.wait_closed()
+        finally:
+            # Only remove the socket if it is still the one this daemon bound
+            try:
+                if os.lstat(path).st_ino == inode:
+                    os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        self.pipeline.close()
+
+
+def run_daemon(
+    pipeline: Pipeline,
+    config: PipelineConfig,
+    input_stream: Optional[BinaryIO] = None,
+    socket_path: Optional[str] = None,
+    concurrency: int = 8,
+) -> None:
+    """Run the daemon until the input stream reaches EOF or, for a socket, until SIGINT/SIGTERM."""
+
+    async def main() -> None:
+        daemon = PipelineDaemon(pipeline, config, concurrency=concurrency)
+        try:
+            if socket_path:
+                await daemon.serve_unix(socket_path)
+            else:
+                await daemon.serve_stream(input_stream or sys.stdin.buffer)
+        finally:
+            daemon.close()
+
+    asyncio.run(main())
@@ -8,6 +8,8 @@ class CerebrasExecutor:
         self.timeout = timeout
         self.max_output_tokens = max_output_tokens
         self.api_url = os.getenv('CEREBRAS_API_URL')
+        # Shared client so repeated calls reuse pooled connections
+        self.client = httpx.Client(timeout=self.timeout)
 
     def generate(self, prompt: str, model: str, images: Optional[List[str]] = None) -> Dict[str, Any]:
         if images is not None:
@@ -27,10 +29,12 @@ class CerebrasExecutor:
             'max_tokens': self.max_output_tokens,
         }
         
-        with httpx.Client(timeout=self.timeout) as client:
-            resp = client.post(self.api_url, headers=headers, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
+        resp = self.client.post(self.api_url, headers=headers, json=payload)
+        resp.raise_for_status()
+        data = resp.json()
 
         text = data['choices'][0].get('text') or data['choices'][0]['message']['content']
         return {'output': text, 'usage': data.get('usage', {})}
+
+    def close(self) -> None:
+        self.client.close()
@@ -40,3 +40,6 @@ class OpenAIExecutor:
                 'total_tokens': response.usage.total_tokens
             } if response.usage else {}
         }
+
+    def close(self) -> None:
+        self.client.close()
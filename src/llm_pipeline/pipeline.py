@@ -1,9 +1,11 @@
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 import re
 import json
+import threading
 from json import JSONDecodeError
-from jsonschema import validate as jsonschema_validate
 from jsonschema.exceptions import ValidationError as JSONSchemaValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
 from .config.models import PipelineConfig, AgentDecision, ExecutorType
 from .registry.template_registry import TemplateRegistry
 from .executors.cerebras import CerebrasExecutor
@@ -13,8 +15,24 @@ class Pipeline:
     def __init__(self, registry: TemplateRegistry, agent):
         self.registry = registry
         self.agent = agent
-    
+        # Executors hold HTTP clients, so keep one per settings combination
+        self._executors: Dict[Tuple[ExecutorType, int, int], Any] = {}
+        self._executors_lock = threading.Lock()
+        # Compiled validators keyed by the serialized output schema
+        self._validators: Dict[str, Any] = {}
+        self._validators_lock = threading.Lock()
+
     def _get_executor(self, executor_type: ExecutorType, config: PipelineConfig):
+        """Return a cached executor of the specified type, creating it on first use."""
+        key = (executor_type, config.timeout_seconds, config.max_output_tokens)
+        with self._executors_lock:
+            executor = self._executors.get(key)
+            if executor is None:
+                executor = self._create_executor(executor_type, config)
+                self._executors[key] = executor
+        return executor
+
+    def _create_executor(self, executor_type: ExecutorType, config: PipelineConfig):
         """Create an executor of the specified type."""
         if executor_type == ExecutorType.CEREBRAS:
             return CerebrasExecutor(timeout=config.timeout_seconds, max_output_tokens=config.max_output_tokens)
@@ -23,6 +41,28 @@ class Pipeline:
         else:
             raise ValueError(f"Unsupported executor type: {executor_type}")
 
+    def _get_validator(self, schema: Dict[str, Any]):
+        """Return a cached validator for the schema, checking the schema only once."""
+        key = json.dumps(schema, sort_keys=True)
+        with self._validators_lock:
+            validator = self._validators.get(key)
+            if validator is None:
+                cls = validator_for(schema)
+                cls.check_schema(schema)
+                validator = cls(schema)
+                self._validators[key] = validator
+        return validator
+
+    def close(self) -> None:
+        """Close all cached executors and their underlying HTTP clients."""
+        with self._executors_lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            close = getattr(executor, 'close', None)
+            if close is not None:
+                close()
+
     def run(self, input_data: Dict[str, Any], config: PipelineConfig) -> Dict[str, Any]:
         decision: AgentDecision = self.agent.decide(input_data, config)
         template = self.registry.get_template(decision.template_name)
@@ -32,6 +72,7 @@ class Pipeline:
         executor_type = decision.executor_type
         
         executor = self._get_executor(executor_type, config)
+        validator = self._get_validator(config.output_schema)
         
         # Get images from input_data
         images = input_data.get('images')
@@ -78,15 +119,14 @@ class Pipeline:
 
             # Always validate against required schema
             if parsed is not None:
-                try:
-                    jsonschema_validate(instance=parsed, schema=config.output_schema)
+                error: Optional[JSONSchemaValidationError] = best_match(validator.iter_errors(parsed))
+                if error is None:
                     parsed_answer = parsed
                     validation_report = {"valid": True, "errors": []}
                     break
-                except JSONSchemaValidationError as ve:
-                    last_validation_errors = str(ve)
-                    validation_report = {"valid": False, "errors": [last_validation_errors]}
-                    continue
+                last_validation_errors = str(error)
+                validation_report = {"valid": False, "errors": [last_validation_errors]}
+                continue
             else:
                 last_validation_errors = "Model output was not valid JSON."
                 validation_report = {"valid": False, "errors": [last_validation_errors]}
@@ -0,0 +1,225 @@
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+
+from llm_pipeline.daemon import MAX_LINE_BYTES, PipelineDaemon, _claim_socket_path, _read_stream_line
+
+
+class StubPipeline:
+    """Echoes its input; ``sleep`` and ``fail`` keys control timing and errors."""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def run(self, input_data, config):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(input_data.get('sleep', 0))
+            if input_data.get('fail'):
+                raise RuntimeError('boom')
+            if input_data.get('unserializable'):
+                return {'answer': object()}
+            return {'answer': input_data}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def close(self):
+        self.closed = True
+
+
+def request(request_id, **input_data):
+    return (json.dumps({'id': request_id, 'input': input_data}) + "\n").encode()
+
+
+def consume(lines, concurrency=4, limit=MAX_LINE_BYTES, chunk_size=None):
+    """Feed ``lines`` through ``_consume`` and return the daemon, pipeline and responses.
+
+    With ``chunk_size`` the data arrives in pieces while the daemon is reading.
+    """
+    pipeline = StubPipeline()
+    responses = []
+
+    async def main():
+        daemon = PipelineDaemon(pipeline, config=None, concurrency=concurrency)
+        reader = asyncio.StreamReader(limit=limit)
+        data = b"".join(lines)
+
+        async def feed():
+            step = chunk_size or len(data)
+            for start in range(0, len(data), step):
+                reader.feed_data(data[start:start + step])
+                await asyncio.sleep(0)
+            reader.feed_eof()
+
+        async def write(response):
+            # Serialize like the real writers so unserializable results surface
+            responses.append(json.loads(json.dumps(response)))
+
+        feeder = asyncio.create_task(feed())
+        await daemon._consume(lambda: _read_stream_line(reader), write)
+        await feeder
+        daemon.close()
+        return daemon
+
+    daemon = asyncio.run(main())
+    return daemon, pipeline, responses
+
+
+def test_responses_are_written_as_requests_finish():
+    daemon, pipeline, responses = consume([request('slow', sleep=0.2), request('fast')])
+    assert [r['id'] for r in responses] == ['fast', 'slow']
+    assert responses[1]['result'] == {'answer': {'sleep': 0.2}}
+    assert pipeline.closed
+
+
+def test_concurrency_limit_is_respected_and_slots_released():
+    lines = [request(i, sleep=0.05) for i in range(6)]
+    daemon, pipeline, responses = consume(lines, concurrency=2)
+    assert len(responses) == 6
+    assert pipeline.max_active == 2
+    assert daemon._slots._value == 2
+
+
+def test_errors_echo_request_id_and_release_slots():
+    lines = [
+        b"not json\n",
+        b"[1, 2]\n",
+        b'{"id": "no-input"}\n',
+        request('fails', fail=True),
+        b"\n",
+    ]
+    daemon, pipeline, responses = consume(lines, concurrency=1)
+    by_id = {r['id']: r for r in responses}
+    assert len(responses) == 4
+    assert 'Invalid JSON' in responses[0]['error']
+    assert "'input'" in by_id['no-input']['error']
+    assert by_id['fails']['error'] == 'RuntimeError: boom'
+    assert daemon._slots._value == 1
+
+
+def test_errors_from_bad_bytes_and_results_still_get_responses():
+    lines = [b'{"id": 1, "input": {"x": "\xff"}}\n', request('odd', unserializable=True)]
+    daemon, pipeline, responses = consume(lines, concurrency=1)
+    assert responses[0] == {'id': None, 'error': responses[0]['error']}
+    assert 'Invalid JSON' in responses[0]['error']
+    assert responses[1]['id'] == 'odd'
+    assert 'Unserializable' in responses[1]['error']
+    assert daemon._slots._value == 1
+
+
+@pytest.mark.parametrize('chunk_size', [None, 50, 7])
+def test_oversized_line_is_skipped_whole_and_stream_continues(chunk_size):
+    lines = [b'{"id": "big", "input": {"x": "' + b"a" * 220 + b'"}}\n', request('after')]
+    daemon, pipeline, responses = consume(lines, concurrency=1, limit=64, chunk_size=chunk_size)
+    assert len(responses) == 2
+    assert 'exceeds' in responses[0]['error']
+    assert responses[1]['id'] == 'after'
+    assert daemon._slots._value == 1
+
+
+def test_serve_stream_reads_regular_file(tmp_path, capsys):
+    path = tmp_path / 'requests.jsonl'
+    path.write_bytes(request(1) + request(2))
+
+    async def main():
+        daemon = PipelineDaemon(StubPipeline(), config=None)
+        with open(path, 'rb') as stream:
+            await daemon.serve_stream(stream)
+        daemon.close()
+
+    asyncio.run(main())
+    responses = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(r['id'] for r in responses) == [1, 2]
+
+
+def test_serve_unix_stops_with_idle_clients_connected():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'daemon.sock')
+
+        async def main():
+            daemon = PipelineDaemon(StubPipeline(), config=None)
+            stop = asyncio.Event()
+            server = asyncio.create_task(daemon.serve_unix(path, stop))
+            while not os.path.exists(path):
+                await asyncio.sleep(0.01)
+
+            idle_reader, idle_writer = await asyncio.open_unix_connection(path)
+            busy_reader, busy_writer = await asyncio.open_unix_connection(path)
+            busy_writer.write(request('in-flight', sleep=0.2))
+            await busy_writer.drain()
+            await asyncio.sleep(0.05)
+
+            stop.set()
+            await asyncio.wait_for(server, timeout=2)
+            response = json.loads(await busy_reader.readline())
+            assert response['id'] == 'in-flight'
+            assert await idle_reader.read() == b""
+            idle_writer.close()
+            busy_writer.close()
+            daemon.close()
+
+        asyncio.run(main())
+        assert not os.path.exists(path)
+
+
+def test_serve_unix_idle_clients_do_not_hold_slots():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'daemon.sock')
+
+        async def main():
+            daemon = PipelineDaemon(StubPipeline(), config=None, concurrency=1)
+            stop = asyncio.Event()
+            server = asyncio.create_task(daemon.serve_unix(path, stop))
+            while not os.path.exists(path):
+                await asyncio.sleep(0.01)
+
+            idle = [await asyncio.open_unix_connection(path) for _ in range(3)]
+            reader, writer = await asyncio.open_unix_connection(path)
+            await asyncio.sleep(0.05)
+            writer.write(request('a') + request('b'))
+            await writer.drain()
+            responses = [json.loads(await asyncio.wait_for(reader.readline(), timeout=2)) for _ in range(2)]
+            assert sorted(r['id'] for r in responses) == ['a', 'b']
+
+            stop.set()
+            await asyncio.wait_for(server, timeout=2)
+            for _, idle_writer in idle:
+                idle_writer.close()
+            writer.close()
+            daemon.close()
+
+        asyncio.run(main())
+
+
+def test_claim_socket_path_refuses_regular_file(tmp_path):
+    path = tmp_path / 'not-a-socket'
+    path.write_text('keep me')
+    with pytest.raises(FileExistsError):
+        _claim_socket_path(str(path))
+    assert path.read_text() == 'keep me'
+
+
+def test_claim_socket_path_refuses_live_socket_and_removes_stale_one():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'daemon.sock')
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen()
+        with pytest.raises(FileExistsError):
+            _claim_socket_path(path)
+        listener.close()
+        assert os.path.exists(path)
+        _claim_socket_path(path)
+        assert not os.path.exists(path)
@@ -0,0 +1,75 @@
+import asyncio
+import httpx
+
+BASE_URL = "https://api.polygon.io"
+
+# Upstream calls a single composite request may have in flight at once
+FAN_OUT_LIMIT = 5
+
+
+class PolygonClient:
+    """Async Polygon REST client sharing one connection pool per process."""
+
+    def __init__(self, api_key, timeout=10.0, max_concurrency=20, transport=None):
+        self.client = httpx.AsyncClient(
+            transport=transport,
+            base_url=BASE_URL,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        )
+        # Caps upstream calls across all requests in this worker; see fan_out for per-request limits
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def get(self, path, **params):
+        params = {k: v for k, v in params.items() if v is not None}
+        async with self.semaphore:
+            resp = await self.client.get(path, params=params)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def fan_out(self, fn, items, limit=FAN_OUT_LIMIT):
+        """Call ``fn`` for each item with at most ``limit`` calls in flight.
+
+        Results come back in input order; exceptions are returned rather than raised
+        so one failing item does not sink the rest.
+        """
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run(item):
+            async with semaphore:
+                return await fn(item)
+
+        return await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def list_tickers(self, search=None, market=None, ticker=None, limit=None):
+        data = await self.get("/v3/reference/tickers", search=search, market=market, ticker=ticker, limit=limit)
+        return data.get("results", [])
+
+    async def list_ticker_news(self, ticker, limit=10, order="asc", sort="published_utc"):
+        data = await self.get("/v2/reference/news", ticker=ticker, limit=limit, order=order, sort=sort)
+        return data.get("results", [])
+
+    async def get_aggs(self, ticker, multiplier, timespan, start, end):
+        data = await self.get(f"/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{start}/{end}")
+        return data.get("results", [])
+
+    async def get_previous_close(self, ticker):
+        data = await self.get(f"/v2/aggs/ticker/{ticker}/prev")
+        results = data.get("results") or []
+        return results[0] if results else None
+
+    async def get_last_trade(self, ticker):
+        data = await self.get(f"/v2/last/trade/{ticker}")
+        return data.get("results")
+
+    async def get_last_quote(self, ticker):
+        data = await self.get(f"/v2/last/nbbo/{ticker}")
+        return data.get("results")
+
+    async def list_trades(self, ticker, limit=10, sort="timestamp", order="desc"):
+        data = await self.get(f"/v3/trades/{ticker}", limit=limit, sort=sort, order=order)
+        return data.get("results", [])
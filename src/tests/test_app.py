@@ -0,0 +1,116 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from polygon_client import FAN_OUT_LIMIT, PolygonClient
+
+
+class StubPolygon:
+    """Serves canned Polygon responses; tickers starting with ``BAD`` fail upstream."""
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        parts = request.url.path.strip("/").split("/")
+        ticker = parts[3] if parts[:3] in (["v2", "last", "nbbo"], ["v2", "aggs", "ticker"]) else None
+        if ticker and ticker.startswith("BAD"):
+            return httpx.Response(500, json={"status": "ERROR"})
+        if parts[:3] == ["v2", "last", "nbbo"]:
+            return httpx.Response(200, json={"results": {"T": ticker, "p": 100.0}})
+        if parts[-1] == "prev":
+            results = [] if ticker == "EMPTY" else [{"T": ticker, "c": 10.0}]
+            return httpx.Response(200, json={"results": results})
+        return httpx.Response(200, json={"results": []})
+
+
+@pytest.fixture
+def stub():
+    return StubPolygon()
+
+
+@pytest.fixture
+def client(stub, monkeypatch):
+    transport = httpx.MockTransport(stub)
+    monkeypatch.setattr(app_module, "PolygonClient", lambda api_key: PolygonClient(api_key, transport=transport))
+    with TestClient(app_module.app) as test_client:
+        yield test_client
+
+
+def test_quotes_isolates_failures_and_normalises_tickers(client, stub):
+    resp = client.get("/v1/quotes", params={"tickers": "aapl, AAPL,msft,bad1"})
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert list(data) == ["AAPL", "MSFT", "BAD1"]
+    assert data["AAPL"] == {"valid": True, "data": {"T": "AAPL", "p": 100.0}}
+    assert data["MSFT"]["valid"] is True
+    assert data["BAD1"]["valid"] is False
+    assert len(stub.requests) == 3
+
+
+def test_quotes_rejects_too_many_tickers(client, stub):
+    tickers = ",".join(f"T{i}" for i in range(app_module.MAX_TICKERS_PER_REQUEST + 1))
+    resp = client.get("/v1/quotes", params={"tickers": tickers})
+    assert resp.status_code == 422
+    assert stub.requests == []
+
+
+def test_quotes_limits_upstream_calls_per_request(client, stub):
+    stub.delay = 0.01
+    tickers = ",".join(f"T{i}" for i in range(FAN_OUT_LIMIT * 3))
+    resp = client.get("/v1/quotes", params={"tickers": tickers})
+    assert resp.status_code == 200
+    assert stub.max_active == FAN_OUT_LIMIT
+
+
+def test_portfolio_values_positions_and_isolates_failures(client, stub):
+    body = {"positions": [
+        {"ticker": " aapl ", "quantity": 2},
+        {"ticker": "EMPTY", "quantity": 1},
+        {"ticker": "BAD", "quantity": 3},
+    ]}
+    resp = client.post("/v1/portfolio", json=body)
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    aapl, empty, bad = data["positions"]
+    assert aapl == {"ticker": "AAPL", "quantity": 2.0, "valid": True, "price": 10.0, "value": 20.0}
+    assert empty["error"] == "No price data available"
+    assert bad["valid"] is False
+    assert data["total_value"] == 20.0
+    assert stub.requests[0].url.path == "/v2/aggs/ticker/AAPL/prev"
+
+
+def test_portfolio_rejects_too_many_positions(client, stub):
+    positions = [{"ticker": f"T{i}", "quantity": 1} for i in range(app_module.MAX_TICKERS_PER_REQUEST + 1)]
+    resp = client.post("/v1/portfolio", json={"positions": positions})
+    assert resp.status_code == 422
+    assert stub.requests == []
+
+
+def test_none_query_params_are_dropped(client, stub):
+    resp = client.get("/v1/validate/aapl")
+    assert resp.json() == {"valid": True, "data": []}
+    params = stub.requests[0].url.params
+    assert dict(params) == {"search": "aapl", "limit": "1"}
+
+
+def test_lifespan_closes_client(stub, monkeypatch):
+    transport = httpx.MockTransport(stub)
+    monkeypatch.setattr(app_module, "PolygonClient", lambda api_key: PolygonClient(api_key, transport=transport))
+    with TestClient(app_module.app):
+        polygon = app_module.app.state.polygon
+        assert not polygon.client.is_closed
+    assert polygon.client.is_closed